@@ -1,13 +1,95 @@
 #!/usr/bin/env python3
 import argparse
+import json
+import re
+import selectors
 import socket
+import sys
 import threading
+import time
 import os
-from datetime import datetime, timezone
 import platform
 
 CRLF = "\r\n"
 
+# One LOOKUP/LIST body line: RFC <num> <title...> <peer_name> <host> <port>
+_RFC_ENTRY_RE = re.compile(rb'^RFC\s+(\d+)\s+(.+?)\s+(\S+)\s+(\S+)\s+(\d+)\s*$', re.M)
+_RFC_LINE_RE = re.compile(rb'[^\r\n]+')
+
+# Title line forms: "RFC <num> - <title>" / "<something> - <title>" or
+# "RFC <num> <title>".
+_TITLE_RE = re.compile(
+    rb'^\s*(?:[^\r\n-]*-\s*(?P<dash>[^\r\n]+)|RFC\s+\S+\s+(?P<rfc>[^\r\n]+))'
+)
+
+# os.splice (Linux, Python 3.10+) moves pagecache bytes to the socket
+# through a pipe without ever entering userspace.
+_HAS_SPLICE = sys.platform == "linux" and hasattr(os, "splice")
+
+_WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+           "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def _format_http_date(epoch) -> str:
+    """RFC 7231 date from an epoch time, skipping strftime's locale path."""
+    t = time.gmtime(epoch)
+    return (
+        f"{_WEEKDAYS[t.tm_wday]}, {t.tm_mday:02d} {_MONTHS[t.tm_mon - 1]} "
+        f"{t.tm_year:04d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d} GMT"
+    )
+
+
+# The Date header only needs second granularity, so format it at most
+# once per second.
+_DATE_CACHE = {'ts': 0, 'val': b''}
+
+
+def _http_date_now() -> bytes:
+    now = int(time.time())
+    if now != _DATE_CACHE['ts']:
+        _DATE_CACHE['val'] = _format_http_date(now).encode('utf-8')
+        _DATE_CACHE['ts'] = now
+    return _DATE_CACHE['val']
+
+
+def _extract_rfc_entries_py(response: bytes, expected_rfc: int):
+    """
+    Pull (rfc_num, title, peer_name, host, port) tuples out of a
+    LOOKUP/LIST response with one pass of a precompiled regex rather
+    than per-line Python string surgery. Module-level so a compiled
+    accelerator can drop in for it (see below).
+    """
+    # Cheapest discriminating compare first: reject non-matching
+    # lines on a byte prefix before any integer parsing.
+    prefix = f"RFC {expected_rfc} ".encode('utf-8')
+
+    entries = []
+    for line_match in _RFC_LINE_RE.finditer(response):
+        line = line_match.group()
+        if not line.startswith(prefix):
+            continue
+        match = _RFC_ENTRY_RE.match(line)
+        if match is None:
+            continue
+        entries.append((
+            expected_rfc,
+            match.group(2).decode('utf-8', 'replace').strip(),
+            match.group(3).decode('utf-8', 'replace'),
+            match.group(4).decode('utf-8', 'replace'),
+            match.group(5).decode('utf-8', 'replace'),
+        ))
+    return entries
+
+
+# Optional compiled fast path: if a _p2pci_parse extension (e.g. built
+# with Cython) is importable it replaces the pure-Python parser; the
+# file stays fully usable standalone without it.
+try:
+    from _p2pci_parse import extract_rfc_entries as _extract_rfc_entries
+except ImportError:
+    _extract_rfc_entries = _extract_rfc_entries_py
+
 
 class P2PPeer:
     def __init__(
@@ -18,18 +100,58 @@ class P2PPeer:
         peer_name=None,
         advertised_host='localhost',
         default_protocol_version="PCP-CI/1.0",
+        tcp_nodelay=True,
     ):
         self.server_host = server_host
         self.server_port = server_port
         self.advertised_host = advertised_host
         self.default_protocol_version = default_protocol_version
+        # Applied to every P2S and P2P socket; bulk-transfer setups can
+        # opt out at construction time.
+        self.tcp_nodelay = tcp_nodelay
 
         unique_name = peer_name or f"{socket.gethostname()}-{os.getpid()}"
         self.hostname = unique_name
         self.upload_port = None
 
         self.server_socket = None        # connection to central server
-        self.upload_server_socket = None # server socket for GET RFC
+        self.upload_server_socket = None # first upload listening socket
+        self._upload_sockets = []        # one listening socket per worker
+
+        # rfc_num -> (body, length, last_modified_header, mtime, check_ts)
+        self._rfc_cache = {}
+        self._rfc_cache_lock = threading.Lock()
+
+        # filename -> (mtime, title), persisted as a JSON sidecar in
+        # the RFC directory so restarts skip re-reading unchanged files.
+        self._title_cache = None
+        self._title_cache_dirty = False
+
+        self._version_bytes = self.default_protocol_version.encode('utf-8')
+
+        # Static pieces of the 200 OK upload response; only Date,
+        # Last-Modified and Content-Length vary per request.
+        self._resp_ok_prefix = f"{self.default_protocol_version} 200 OK{CRLF}Date: ".encode('utf-8')
+        self._resp_os_part = f"{CRLF}OS: {platform.system()} {platform.release()}{CRLF}Last-Modified: ".encode('utf-8')
+        self._resp_ct_suffix = f"{CRLF}Content-Type: text/plain{CRLF}{CRLF}".encode('utf-8')
+
+        # Error responses never vary, so build them once instead of
+        # formatting and encoding an f-string on every bad request.
+        self._resp_400 = f"{self.default_protocol_version} 400 Bad Request{CRLF}{CRLF}".encode('utf-8')
+        self._resp_404 = f"{self.default_protocol_version} 404 Not Found{CRLF}{CRLF}".encode('utf-8')
+        self._resp_505 = f"{self.default_protocol_version} 505 PCP-CI Version Not Supported{CRLF}{CRLF}".encode('utf-8')
+
+        # Buffered bytes from the server connection; responses are
+        # framed out of it by _recv_server_response.
+        self._server_buf = bytearray()
+
+        # Kept-alive sockets to other peers, keyed by (host, port).
+        # Bounded LRU: get_rfc pops on use and _pool_peer_socket
+        # re-inserts, so dict order is recency order.
+        self._peer_conns = {}
+
+        # One splice pipe per upload worker thread, created lazily.
+        self._splice_pipes = threading.local()
 
         if rfc_dir is None:
             self.rfc_dir = f"{self.hostname}_rfcs"
@@ -40,106 +162,345 @@ class P2PPeer:
     # -----------------------------
     # Upload server (peer-to-peer)
     # -----------------------------
+    UPLOAD_REQUEST_LIMIT = 8192
+    # Bodies up to this size are cached in memory; larger RFCs are
+    # streamed with socket.sendfile() so their bytes never cross into
+    # userspace.
+    CACHE_MAX_BODY = 256 * 1024
+    # LRU bound on cached entries (worst case ~16 MiB of bodies);
+    # refreshed-on-hit insertion order makes the first key the LRU,
+    # same scheme as the peer connection pool.
+    RFC_CACHE_MAX = 64
+
     def start_upload_server(self):
-        self.upload_server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.upload_server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        # Bind to any available port
-        self.upload_server_socket.bind(('', 0))
-        self.upload_port = self.upload_server_socket.getsockname()[1]
-        self.upload_server_socket.listen(5)
+        """
+        Start one upload worker per core, each with its own listening
+        socket bound to the same port via SO_REUSEPORT so the kernel
+        spreads incoming connections across workers. Each worker runs a
+        selector loop and serves requests inline -- no thread is spawned
+        per connection, so a burst of downloads costs at most one worker
+        thread per core rather than one ~8 MB thread stack per client.
+
+        The selector loops fill the same role an asyncio/uvloop event
+        loop would (many idle connections, one poller, no per-connection
+        thread) without pulling in a third-party loop or running an
+        asyncio loop next to the blocking stdin CLI in run().
+        """
+        n_workers = os.cpu_count() or 1
+        if not hasattr(socket, "SO_REUSEPORT"):
+            n_workers = 1
+
+        self._upload_sockets = []
+        for _ in range(n_workers):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if n_workers > 1:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            # Default send buffers are sized for trickles, not bulk RFC
+            # transfers; ask for 1 MiB so the send window can open up.
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+            # First socket picks a free port; the rest share it.
+            sock.bind(('', self.upload_port or 0))
+            if self.upload_port is None:
+                self.upload_port = sock.getsockname()[1]
+            sock.listen(1024)
+            sock.setblocking(False)
+            self._upload_sockets.append(sock)
+
+        self.upload_server_socket = self._upload_sockets[0]
+
+        print(f"Upload server started on port {self.upload_port} ({n_workers} worker(s))")
+
+        for worker_id, sock in enumerate(self._upload_sockets):
+            t = threading.Thread(
+                target=self._upload_worker, args=(sock, worker_id)
+            )
+            t.daemon = True
+            t.start()
+
+    def _upload_worker(self, listen_socket: socket.socket, worker_id: int):
+        """
+        Per-core event loop: accept connections, buffer each request
+        until its CRLF-CRLF terminator arrives, then answer it inline.
+        """
+        if hasattr(os, "sched_setaffinity"):
+            try:
+                os.sched_setaffinity(0, {worker_id % (os.cpu_count() or 1)})
+            except OSError:
+                pass
 
-        print(f"Upload server started on port {self.upload_port}")
+        sel = selectors.DefaultSelector()
+        sel.register(listen_socket, selectors.EVENT_READ, None)
 
-        t = threading.Thread(target=self.handle_uploads)
-        t.daemon = True
-        t.start()
+        try:
+            while True:
+                events = sel.select()
+                for key, _ in events:
+                    if key.data is None:
+                        self._accept_uploads(sel, listen_socket)
+                    else:
+                        self._read_upload(sel, key.fileobj, key.data)
+        except (OSError, ValueError):
+            # Listening socket closed during shutdown.
+            pass
+        finally:
+            sel.close()
 
-    def handle_uploads(self):
+    def _accept_uploads(self, sel: selectors.BaseSelector, listen_socket: socket.socket):
+        while True:
+            try:
+                conn, _ = listen_socket.accept()
+            except (BlockingIOError, OSError):
+                break
+            conn.setblocking(False)
+            # Small request, (possibly) large response: kill both the
+            # Nagle and delayed-ACK sides of the classic stall.
+            if self.tcp_nodelay:
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if hasattr(socket, "TCP_QUICKACK"):
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+            sel.register(conn, selectors.EVENT_READ, bytearray())
+
+    def _read_upload(self, sel: selectors.BaseSelector, conn: socket.socket, buf: bytearray):
+        # Drain the socket in one pass rather than taking a fresh
+        # readiness wakeup per 4 KiB.
+        eof = False
         while True:
             try:
-                client_socket, addr = self.upload_server_socket.accept()
-                t = threading.Thread(
-                    target=self.handle_upload_request, args=(client_socket,)
-                )
-                t.start()
-            except Exception:
+                chunk = conn.recv(4096)
+            except BlockingIOError:
+                break
+            except OSError:
+                eof = True
+                break
+            if not chunk:
+                eof = True
                 break
+            buf.extend(chunk)
+            if len(buf) >= self.UPLOAD_REQUEST_LIMIT:
+                break
+
+        if eof and not buf:
+            sel.unregister(conn)
+            conn.close()
+            return
 
-    def handle_upload_request(self, client_socket: socket.socket):
+        # Serve every complete request in the buffer in one batch --
+        # they share the per-second Date header and the precomputed
+        # response fragments. A keep-alive client stays registered for
+        # its next GET.
+        while True:
+            sep = buf.find(b"\r\n\r\n")
+            sep_len = 4
+            if sep == -1:
+                sep = buf.find(b"\n\n")
+                sep_len = 2
+            if sep == -1:
+                if len(buf) >= self.UPLOAD_REQUEST_LIMIT:
+                    # Header never terminated within the limit: reject
+                    # instead of guessing at a truncated request.
+                    try:
+                        conn.setblocking(True)
+                        conn.sendall(self._resp_400)
+                    except OSError:
+                        pass
+                    sel.unregister(conn)
+                    conn.close()
+                elif eof:
+                    # Partial request with no more data coming.
+                    sel.unregister(conn)
+                    conn.close()
+                return
+
+            frame = bytes(buf[:sep + sep_len])
+            del buf[:sep + sep_len]
+
+            keep_alive = self.handle_upload_request(conn, frame)
+            if not keep_alive:
+                sel.unregister(conn)
+                conn.close()
+                return
+            conn.setblocking(False)
+
+    def handle_upload_request(self, client_socket: socket.socket, data: bytes) -> bool:
+        """
+        Answer one framed request. Returns True when the connection
+        should stay open for further requests (client asked for
+        keep-alive and the response went out cleanly).
+        """
         try:
-            data = client_socket.recv(4096).decode('utf-8')
-            response = self.process_upload_request(data)
-            client_socket.sendall(response.encode('utf-8'))
+            response, body_file = self.process_upload_request(data)
+            client_socket.setblocking(True)
+            # Single batched send: header (and any in-memory body) go
+            # out in one syscall.
+            client_socket.sendall(response)
+            if body_file is not None:
+                self._send_body_file(client_socket, body_file)
+            return b"keep-alive" in data
         except Exception:
-            pass
-        finally:
-            client_socket.close()
+            return False
+
+    def _send_body_file(self, client_socket: socket.socket, body_file: str):
+        """
+        Send a large body without userspace copies: splice() through a
+        per-worker pipe on Linux, sendfile() elsewhere or when splice
+        refuses the file.
+        """
+        with open(body_file, 'rb') as f:
+            if _HAS_SPLICE and self._splice_body(client_socket, f):
+                return
+            client_socket.sendfile(f)
+
+    def _splice_body(self, client_socket: socket.socket, f) -> bool:
+        pipe = getattr(self._splice_pipes, 'pipe', None)
+        if pipe is None:
+            pipe = os.pipe()
+            self._splice_pipes.pipe = pipe
+        pipe_r, pipe_w = pipe
+
+        in_fd = f.fileno()
+        out_fd = client_socket.fileno()
+        moved_any = False
+        while True:
+            try:
+                filled = os.splice(in_fd, pipe_w, 1 << 20, flags=os.SPLICE_F_MOVE)
+            except OSError:
+                if moved_any:
+                    raise
+                # Some filesystems reject splice outright; let the
+                # caller fall back to sendfile from offset 0.
+                return False
+            if filled == 0:
+                return True
+            moved_any = True
+            while filled > 0:
+                filled -= os.splice(pipe_r, out_fd, filled, flags=os.SPLICE_F_MOVE)
 
-    def process_upload_request(self, request: str) -> str:
-        lines = request.replace("\r\n", "\n").strip().split('\n')
-        if not lines:
-            return f"{self.default_protocol_version} 400 Bad Request{CRLF}{CRLF}"
+    def process_upload_request(self, request: bytes):
+        """
+        Parse one GET request and build its response.
 
-        request_line = lines[0].split()
-        # Expect: GET RFC <num> <version>
-        if len(request_line) < 4 or request_line[0] != "GET" or request_line[1] != "RFC":
-            return f"{self.default_protocol_version} 400 Bad Request{CRLF}{CRLF}"
+        Returns (response_bytes, body_file): for errors and cached
+        bodies the full response is in response_bytes and body_file is
+        None; for large RFCs response_bytes holds only the header and
+        body_file names the file to stream with sendfile().
+        """
+        # Expect: GET RFC <num> <version>. Parse the request line in
+        # place with byte offsets instead of decoding and splitting the
+        # whole buffer into lines.
+        line_end = request.find(b"\r\n")
+        if line_end == -1:
+            line_end = request.find(b"\n")
+            if line_end == -1:
+                line_end = len(request)
+
+        if not request.startswith(b"GET RFC "):
+            return self._resp_400, None
+
+        num_end = request.find(b" ", 8, line_end)
+        if num_end == -1:
+            return self._resp_400, None
 
         try:
-            rfc_num = int(request_line[2])
+            rfc_num = int(request[8:num_end])
         except ValueError:
-            return f"{self.default_protocol_version} 400 Bad Request{CRLF}{CRLF}"
+            return self._resp_400, None
 
-        version = request_line[3]
-        if version != self.default_protocol_version:
-            return f"{self.default_protocol_version} 505 PCP-CI Version Not Supported{CRLF}{CRLF}"
+        if request[num_end + 1:line_end].strip() != self._version_bytes:
+            return self._resp_505, None
 
-        rfc_file = os.path.join(self.rfc_dir, f"rfc{rfc_num}.txt")
-        if not os.path.exists(rfc_file):
-            return f"{self.default_protocol_version} 404 Not Found{CRLF}{CRLF}"
+        entry = self._load_rfc(rfc_num)
+        if entry is None:
+            return self._resp_404, None
+
+        body, file_size, last_modified = entry[0], entry[1], entry[2]
+
+        header = b"".join((
+            self._resp_ok_prefix,
+            _http_date_now(),
+            self._resp_os_part,
+            last_modified.encode('utf-8'),
+            b"\r\nContent-Length: ",
+            str(file_size).encode('utf-8'),
+            self._resp_ct_suffix,
+        ))
 
+        if body is None:
+            return header, os.path.join(self.rfc_dir, f"rfc{rfc_num}.txt")
+        return header + body, None
+
+    def _load_rfc(self, rfc_num: int):
+        """
+        Return the cached (body, length, last_modified_header, mtime,
+        check_ts) tuple for an RFC, re-reading the file only when its
+        mtime changes. The stat() revalidation runs at most once per
+        second per RFC so repeated GETs of a popular RFC cost a dict
+        lookup instead of file I/O.
+        """
+        now = time.monotonic()
+        with self._rfc_cache_lock:
+            entry = self._rfc_cache.pop(rfc_num, None)
+            if entry is not None:
+                # Re-insert on hit so insertion order is recency order.
+                self._rfc_cache[rfc_num] = entry
+        if entry is not None and now - entry[4] < 1.0:
+            return entry
+
+        rfc_file = os.path.join(self.rfc_dir, f"rfc{rfc_num}.txt")
         try:
-            with open(rfc_file, 'r') as f:
-                content = f.read()
-
-            file_size = len(content.encode('utf-8'))
-            last_mtime = datetime.fromtimestamp(os.path.getmtime(rfc_file), timezone.utc)
-            last_modified = last_mtime.strftime('%a, %d %b %Y %H:%M:%S GMT')
-            current_time = datetime.now(timezone.utc).strftime('%a, %d %b %Y %H:%M:%S GMT')
-
-            response_lines = [
-                f"{self.default_protocol_version} 200 OK",
-                f"Date: {current_time}",
-                f"OS: {platform.system()} {platform.release()}",
-                f"Last-Modified: {last_modified}",
-                f"Content-Length: {file_size}",
-                "Content-Type: text/plain",
-                "",
-                content,
-            ]
-            return CRLF.join(response_lines)
-        except Exception:
-            return f"{self.default_protocol_version} 404 Not Found{CRLF}{CRLF}"
+            stat_result = os.stat(rfc_file)
+        except OSError:
+            with self._rfc_cache_lock:
+                self._rfc_cache.pop(rfc_num, None)
+            return None
+
+        if entry is not None and entry[3] == stat_result.st_mtime:
+            entry = (entry[0], entry[1], entry[2], entry[3], now)
+        else:
+            if stat_result.st_size > self.CACHE_MAX_BODY:
+                # Too big to hold in memory; Content-Length comes from
+                # stat() and the body is streamed with sendfile().
+                body = None
+            else:
+                try:
+                    with open(rfc_file, 'rb') as f:
+                        body = f.read()
+                except OSError:
+                    return None
+            # Memoized alongside the body: only reformatted when the
+            # file's mtime changes.
+            last_modified = _format_http_date(stat_result.st_mtime)
+            size = stat_result.st_size if body is None else len(body)
+            entry = (body, size, last_modified, stat_result.st_mtime, now)
+
+        with self._rfc_cache_lock:
+            self._rfc_cache.pop(rfc_num, None)
+            self._rfc_cache[rfc_num] = entry
+            while len(self._rfc_cache) > self.RFC_CACHE_MAX:
+                del self._rfc_cache[next(iter(self._rfc_cache))]
+        return entry
 
     # -----------------------------
     # Connection to central server
     # -----------------------------
     def connect_to_server(self):
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # Commands are far smaller than one MSS; without TCP_NODELAY,
+        # Nagle + delayed ACK can stall each one by tens of ms.
+        if self.tcp_nodelay:
+            self.server_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         self.server_socket.connect((self.server_host, self.server_port))
         print(f"Connected to server at {self.server_host}:{self.server_port}")
 
+    def _send_command(self, request: bytes) -> str:
+        """Send one pre-encoded P2S request and return its response."""
+        self.server_socket.sendall(request)
+        return self._recv_server_response()
+
     # -----------------------------
     # P2S operations: ADD / LOOKUP / LIST
     # -----------------------------
-    def add_rfc(self, rfc_num: int, version: str):
-        rfc_path = os.path.join(self.rfc_dir, f"rfc{rfc_num}.txt")
-        if not os.path.exists(rfc_path):
-            self._print_status(404, "Not Found", f"Missing file rfc{rfc_num}.txt in {self.rfc_dir}", version)
-            return
-
-        title = self.extract_rfc_title(rfc_path) or f"RFC {rfc_num}"
-
+    def _build_add_request(self, rfc_num: int, title: str, version: str) -> bytes:
         lines = [
             f"ADD RFC {rfc_num} {version}",
             f"Host: {self.advertised_host}",
@@ -147,11 +508,62 @@ class P2PPeer:
             f"Port: {self.upload_port}",
             f"Title: {title}",
             "",
+            "",
         ]
-        request = CRLF.join(lines)
+        return CRLF.join(lines).encode('utf-8')
+
+    def _recv_server_response(self) -> str:
+        """
+        Read exactly one response from the server connection.
+
+        Responses are framed by the CRLF-CRLF header terminator plus
+        the Content-Length header, so pipelined responses queued behind
+        this one stay in the buffer for the next call.
+        """
+        buf = self._server_buf
+        while True:
+            sep = buf.find(b"\r\n\r\n")
+            if sep != -1:
+                break
+            chunk = self.server_socket.recv(4096)
+            if not chunk:
+                # Connection closed: hand back whatever we have.
+                response = bytes(buf).decode('utf-8', errors='replace')
+                buf.clear()
+                return response
+            buf.extend(chunk)
+
+        body_len = 0
+        header = bytes(buf[:sep])
+        for line in header.split(b"\r\n"):
+            if line[:15].lower() == b"content-length:":
+                try:
+                    body_len = int(line[15:])
+                except ValueError:
+                    pass
+                break
+
+        total = sep + 4 + body_len
+        while len(buf) < total:
+            chunk = self.server_socket.recv(4096)
+            if not chunk:
+                total = len(buf)
+                break
+            buf.extend(chunk)
+
+        response = bytes(buf[:total]).decode('utf-8', errors='replace')
+        del buf[:total]
+        return response
+
+    def add_rfc(self, rfc_num: int, version: str):
+        rfc_path = os.path.join(self.rfc_dir, f"rfc{rfc_num}.txt")
+        if not os.path.exists(rfc_path):
+            self._print_status(404, "Not Found", f"Missing file rfc{rfc_num}.txt in {self.rfc_dir}", version)
+            return
 
-        self.server_socket.sendall(request.encode('utf-8'))
-        response = self.server_socket.recv(4096).decode('utf-8')
+        title = self.extract_rfc_title(rfc_path) or f"RFC {rfc_num}"
+
+        response = self._send_command(self._build_add_request(rfc_num, title, version))
         print(f"ADD response: {response.strip()}")
 
     def lookup_rfc(self, rfc_num: int, version: str) -> str:
@@ -161,11 +573,9 @@ class P2PPeer:
             f"Hostname: {self.hostname}",
             f"Port: {self.upload_port}",
             "",
+            "",
         ]
-        request = CRLF.join(lines)
-
-        self.server_socket.sendall(request.encode('utf-8'))
-        response = self.server_socket.recv(4096).decode('utf-8')
+        response = self._send_command(CRLF.join(lines).encode('utf-8'))
         print(f"LOOKUP response:\n{response}")
         return response
 
@@ -176,63 +586,134 @@ class P2PPeer:
             f"Hostname: {self.hostname}",
             f"Port: {self.upload_port}",
             "",
+            "",
         ]
-        request = CRLF.join(lines)
-
-        self.server_socket.sendall(request.encode('utf-8'))
-        response = self.server_socket.recv(4096).decode('utf-8')
+        response = self._send_command(CRLF.join(lines).encode('utf-8'))
         print(f"LIST response:\n{response}")
         return response
 
     # -----------------------------
     # Download from another peer
     # -----------------------------
-    def get_rfc(self, rfc_num: int, peer_host: str, peer_port: int, peer_name: str, version: str) -> bool:
+    def _connect_peer(self, peer_host: str, peer_port: int) -> socket.socket:
         get_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        try:
-            get_socket.connect((peer_host, int(peer_port)))
+        # Ask for a big kernel receive buffer before connecting so
+        # the window scales for bulk transfers.
+        get_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        if self.tcp_nodelay:
+            get_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        get_socket.connect((peer_host, peer_port))
+        return get_socket
 
-            lines = [
-                f"GET RFC {rfc_num} {version}",
-                f"Host: {self.advertised_host}",
-                f"Hostname: {self.hostname}",
-                f"OS: {platform.system()} {platform.release()}",
-                "",
-            ]
-            request = CRLF.join(lines)
-
-            get_socket.sendall(request.encode('utf-8'))
+    def get_rfc(self, rfc_num: int, peer_host: str, peer_port: int, peer_name: str, version: str) -> bool:
+        """
+        Download one RFC, reusing a kept-alive connection to the peer
+        when one is pooled. The GET asks for keep-alive; when the
+        response carries a Content-Length the body is framed by it and
+        the socket goes back into the pool, saving the handshake and
+        slow-start on the next download from the same peer.
+        """
+        lines = [
+            f"GET RFC {rfc_num} {version}",
+            f"Host: {self.advertised_host}",
+            f"Hostname: {self.hostname}",
+            f"OS: {platform.system()} {platform.release()}",
+            "Connection: keep-alive",
+            "",
+            "",
+        ]
+        request = CRLF.join(lines).encode('utf-8')
 
-            # Read until connection closes
-            chunks = []
-            while True:
-                chunk = get_socket.recv(8192)
-                if not chunk:
+        conn_key = (peer_host, int(peer_port))
+        get_socket = None
+        try:
+            # First attempt reuses a pooled socket; a stale one gets
+            # evicted and replaced with a fresh connection.
+            for attempt in (0, 1):
+                get_socket = self._peer_conns.pop(conn_key, None)
+                reused = get_socket is not None
+                if not reused:
+                    get_socket = self._connect_peer(*conn_key)
+
+                buf = bytearray()
+                split_index = -1
+                sep_len = 4
+                try:
+                    get_socket.sendall(request)
+                    # Header first: read small chunks until the blank
+                    # line so only the header is ever held in memory.
+                    header_limit = 16384
+                    while True:
+                        chunk = get_socket.recv(4096)
+                        if not chunk:
+                            break
+                        buf.extend(chunk)
+                        split_index = buf.find(b"\r\n\r\n")
+                        if split_index == -1:
+                            split_index = buf.find(b"\n\n")
+                            if split_index != -1:
+                                sep_len = 2
+                        if split_index != -1 or len(buf) >= header_limit:
+                            break
+                except OSError:
+                    split_index = -1
+
+                if split_index != -1 or not reused:
                     break
-                chunks.append(chunk)
-            response = b"".join(chunks).decode('utf-8', errors='replace')
-
-            header_sep = f"{CRLF}{CRLF}"
-            split_index = response.find(header_sep)
-            sep_len = len(header_sep)
-            if split_index == -1:
-                split_index = response.find("\n\n")
-                sep_len = 2
+                get_socket.close()
+                get_socket = None
 
             if split_index == -1:
                 self._print_status(400, "Bad Request", f"Malformed response for RFC {rfc_num}", version)
                 return False
 
-            status_line = response[:split_index].splitlines()[0]
+            header = bytes(buf[:split_index]).decode('utf-8', errors='replace')
+            status_line = header.splitlines()[0] if header else ""
+
+            content_length = None
+            for line in header.splitlines()[1:]:
+                if line.lower().startswith("content-length:"):
+                    try:
+                        content_length = int(line.split(':', 1)[1])
+                    except ValueError:
+                        pass
+                    break
+
             if "200 OK" not in status_line:
                 print(status_line)
+                if content_length == 0 or content_length is None:
+                    self._pool_peer_socket(conn_key, get_socket)
+                    get_socket = None
                 return False
 
-            content = response[split_index + sep_len:]
-
+            body_start = split_index + sep_len
             rfc_file = os.path.join(self.rfc_dir, f"rfc{rfc_num}.txt")
-            with open(rfc_file, 'w') as f:
-                f.write(content)
+            recv_buf = bytearray(65536)
+            view = memoryview(recv_buf)
+            with open(rfc_file, 'wb') as f:
+                if content_length is None:
+                    # No framing from the peer: body runs to EOF and the
+                    # socket cannot be reused.
+                    f.write(buf[body_start:])
+                    while True:
+                        n = get_socket.recv_into(view)
+                        if not n:
+                            break
+                        f.write(view[:n])
+                else:
+                    have = min(len(buf) - body_start, content_length)
+                    f.write(buf[body_start:body_start + have])
+                    remaining = content_length - have
+                    while remaining > 0:
+                        n = get_socket.recv_into(view[:min(len(view), remaining)])
+                        if not n:
+                            raise OSError("connection closed mid-body")
+                        f.write(view[:n])
+                        remaining -= n
+
+            if content_length is not None:
+                self._pool_peer_socket(conn_key, get_socket)
+                get_socket = None
 
             self._print_status(200, "OK", f"RFC {rfc_num} saved to {rfc_file} (from {peer_name})", version)
             return True
@@ -241,46 +722,168 @@ class P2PPeer:
             self._print_status(400, "Bad Request", f"GET failed for RFC {rfc_num} from {peer_name}: {e}", version)
             return False
         finally:
-            get_socket.close()
+            if get_socket is not None:
+                get_socket.close()
+
+    PEER_POOL_MAX = 16
+
+    def _pool_peer_socket(self, conn_key, get_socket):
+        """Return a still-framed socket to the keep-alive pool."""
+        old = self._peer_conns.pop(conn_key, None)
+        if old is not None:
+            old.close()
+        self._peer_conns[conn_key] = get_socket
+        while len(self._peer_conns) > self.PEER_POOL_MAX:
+            # Least recently used sits first in insertion order.
+            oldest = next(iter(self._peer_conns))
+            self._peer_conns.pop(oldest).close()
 
     # -----------------------------
     # Helper: register local RFC files on startup
     # -----------------------------
     def register_local_rfcs(self):
-        if not os.path.exists(self.rfc_dir):
+        """
+        Register every local rfc<num>.txt with one pipelined burst so
+        startup costs one round trip instead of one per file.
+        """
+        try:
+            entries = os.scandir(self.rfc_dir)
+        except OSError:
             return
 
-        for filename in os.listdir(self.rfc_dir):
-            if filename.startswith("rfc") and filename.endswith(".txt"):
+        rfcs = []
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if not (name.startswith("rfc") and name.endswith(".txt")):
+                    continue
                 try:
-                    rfc_num = int(filename[3:-4])
+                    rfc_num = int(name[3:-4])
                 except ValueError:
                     continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+
+                title = self.extract_rfc_title(entry.path) or f"RFC {rfc_num}"
+                rfcs.append((rfc_num, title, self.default_protocol_version))
+
+        self._save_title_cache()
+        self.add_rfcs_bulk(rfcs)
+
+    # Linux rejects sendmsg calls with more than IOV_MAX (1024) buffers.
+    SENDMSG_MAX_IOV = 1024
+
+    def add_rfcs_bulk(self, rfcs):
+        """
+        Pipeline ADDs for a batch of (rfc_num, title, version) tuples:
+        every request goes out in one burst, then the responses are
+        drained, so the batch pays one round trip plus serialization
+        rather than a full RTT stall per RFC.
+        """
+        requests = [
+            self._build_add_request(rfc_num, title, version)
+            for rfc_num, title, version in rfcs
+        ]
+        if not requests:
+            return
 
-                self.add_rfc(rfc_num, self.default_protocol_version)
+        if hasattr(self.server_socket, 'sendmsg'):
+            # Scatter-gather: one syscall per slice, and the kernel
+            # packs the small ADDs into as few segments as possible.
+            # sendmsg accepts at most IOV_MAX (1024 on Linux) buffers
+            # per call, so large directories go out in slices.
+            for start in range(0, len(requests), self.SENDMSG_MAX_IOV):
+                batch = requests[start:start + self.SENDMSG_MAX_IOV]
+                sent = self.server_socket.sendmsg(batch)
+                remainder = b"".join(batch)[sent:]
+                if remainder:
+                    self.server_socket.sendall(remainder)
+        else:
+            self.server_socket.sendall(b"".join(requests))
+
+        for _ in range(len(requests)):
+            response = self._recv_server_response()
+            print(f"ADD response: {response.strip()}")
+
+    TITLE_CACHE_FILE = ".titles.json"
+
+    def _load_title_cache(self):
+        path = os.path.join(self.rfc_dir, self.TITLE_CACHE_FILE)
+        cache = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                raw = json.load(f)
+            for name, entry in raw.items():
+                if isinstance(entry, list) and len(entry) == 2:
+                    cache[name] = (float(entry[0]), entry[1])
+        except (OSError, ValueError):
+            # Missing or corrupt sidecar: start cold.
+            pass
+        self._title_cache = cache
+
+    def _save_title_cache(self):
+        """Persist the title sidecar; best-effort, cache only."""
+        if not self._title_cache_dirty:
+            return
+        path = os.path.join(self.rfc_dir, self.TITLE_CACHE_FILE)
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self._title_cache, f)
+        except OSError:
+            pass
+        self._title_cache_dirty = False
 
     def extract_rfc_title(self, filepath: str) -> str:
         """
         Attempt to extract the RFC title from the first line of the file.
+
+        Titles are memoized by (filename, mtime) in a JSON sidecar so a
+        restart over an unchanged directory never reopens the files.
+        Only the first 512 bytes are read on a miss -- one bounded read
+        through a raw fd instead of pulling a whole buffered block
+        through the io stack just to use one line.
         """
+        if self._title_cache is None:
+            self._load_title_cache()
+
+        name = os.path.basename(filepath)
         try:
-            with open(filepath, 'r') as file_obj:
-                first_line = file_obj.readline().strip()
+            mtime = os.stat(filepath).st_mtime
         except OSError:
             return None
 
-        if not first_line:
-            return None
+        cached = self._title_cache.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        title = self._read_rfc_title(filepath)
+        if title is not None:
+            self._title_cache[name] = (mtime, title)
+            self._title_cache_dirty = True
+        return title
 
-        if '-' in first_line:
-            _, title = first_line.split('-', 1)
-            return title.strip() or None
+    def _read_rfc_title(self, filepath: str) -> str:
+        try:
+            fd = os.open(filepath, os.O_RDONLY)
+            try:
+                head = os.read(fd, 512)
+            finally:
+                os.close(fd)
+        except OSError:
+            return None
 
-        parts = first_line.split()
-        if len(parts) >= 3 and parts[0].upper() == "RFC":
-            return " ".join(parts[2:]).strip() or None
+        match = _TITLE_RE.match(head)
+        if match:
+            title = match.group('dash') or match.group('rfc')
+            title = title.decode('utf-8', 'replace').strip()
+            if title:
+                return title
 
-        return first_line
+        line_end = head.find(b'\n')
+        if line_end == -1:
+            line_end = len(head)
+        first_line = head[:line_end].decode('utf-8', 'replace').strip()
+        return first_line or None
 
     # -----------------------------
     # Main CLI loop
@@ -385,8 +988,11 @@ class P2PPeer:
         finally:
             if self.server_socket:
                 self.server_socket.close()
-            if self.upload_server_socket:
-                self.upload_server_socket.close()
+            for sock in self._peer_conns.values():
+                sock.close()
+            self._peer_conns.clear()
+            for sock in getattr(self, '_upload_sockets', []):
+                sock.close()
 
     def _print_status(self, code: int, phrase: str, message: str = None, version: str = None):
         protocol = version or self.default_protocol_version
@@ -396,32 +1002,14 @@ class P2PPeer:
         print(status_line)
 
     def _status_line(self, response: str) -> str:
-        normalized = response.replace("\r\n", "\n")
-        lines = normalized.strip().split('\n')
-        return lines[0] if lines else ""
-
-    def _extract_rfc_entries(self, response: str, expected_rfc: int):
-        normalized = response.replace("\r\n", "\n")
-        lines = [line.strip() for line in normalized.strip().split('\n') if line.strip()]
-        entries = []
-        for line in lines:
-            if not line.startswith("RFC"):
-                continue
-            parts = line.split()
-            if len(parts) < 6:
-                continue
-            try:
-                rfc_num = int(parts[1])
-            except ValueError:
-                continue
-            if rfc_num != expected_rfc:
-                continue
-            peer_host = parts[-2]
-            peer_port = parts[-1]
-            peer_name = parts[-3]
-            title = " ".join(parts[2:-3]).strip()
-            entries.append((rfc_num, title, peer_name, peer_host, peer_port))
-        return entries
+        # Cut the first line directly; no need to normalize or split
+        # the whole response.
+        return response.lstrip().partition("\n")[0].rstrip()
+
+    def _extract_rfc_entries(self, response, expected_rfc: int):
+        if isinstance(response, str):
+            response = response.encode('utf-8', 'replace')
+        return _extract_rfc_entries(response, expected_rfc)
 
 
 if __name__ == "__main__":
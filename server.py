@@ -1,61 +1,146 @@
 #!/usr/bin/env python3
+import asyncio
+import logging
+import logging.handlers
+import queue
 import socket
-import threading
-from datetime import datetime, timezone
+import time
 import platform
 
 CRLF = "\r\n"
 PROTOCOL_VERSION = "PCP-CI/1.0"
 
+_WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+           "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+# Responses only need second-granularity dates, so the formatted string
+# is rebuilt at most once per second.
+_DATE_CACHE = [0, ""]
+
+
+def _http_date_now() -> str:
+    now = int(time.time())
+    if now != _DATE_CACHE[0]:
+        t = time.gmtime(now)
+        _DATE_CACHE[1] = (
+            f"{_WEEKDAYS[t.tm_wday]}, {t.tm_mday:02d} {_MONTHS[t.tm_mon - 1]} "
+            f"{t.tm_year:04d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d} GMT"
+        )
+        _DATE_CACHE[0] = now
+    return _DATE_CACHE[1]
+
+# Optional faster event loop: if uvloop is installed its policy replaces
+# the default selector loop; the server stays fully usable without it.
+# (Kernel-side io_uring backends need native bindings that don't belong
+# in a two-file stdlib project.)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 
 class P2PServer:
-    def __init__(self, port=7734):
+    def __init__(self, port=7734, tcp_nodelay=True, verbose=True):
         self.port = port
-        # List of active peers: list of (peer_name, host, upload_port)
-        self.peers = []
-        # RFC index: list of (rfc_num, title, peer_name, host, upload_port)
-        self.rfc_index = []
-        self.lock = threading.Lock()
+        # P2S exchanges are tiny; Nagle + delayed ACK only adds latency.
+        self.tcp_nodelay = tcp_nodelay
+        # Per-request logging; stdout writes cost real time under load,
+        # so benchmarks can turn them off.
+        self.verbose = verbose
+        # platform.system()/release() can hit the OS; resolve them once.
+        self._os_info = f"{platform.system()} {platform.release()}"
+        # Active peers: set of (peer_name, host, upload_port)
+        self.peers = set()
+        # RFC index, hashed both ways so ADD/LOOKUP are O(1) and a
+        # disconnect only touches that peer's own records. Each record
+        # maps to its preformatted "RFC ..." wire line, built once on
+        # ADD, so LOOKUP/LIST just join cached strings:
+        #   rfc_num -> {(title, peer_name, host, upload_port): wire line}
+        self.rfc_by_num = {}
+        #   (peer_name, host, upload_port) -> set of (rfc_num, title)
+        self.rfcs_by_peer = {}
+        # Request logging goes through a queue to a background thread,
+        # so the event loop never blocks on a stdout write.
+        log_queue = queue.SimpleQueue()
+        self._log = logging.getLogger(f"p2pci.server.{id(self)}")
+        self._log.setLevel(logging.INFO)
+        self._log.propagate = False
+        self._log.addHandler(logging.handlers.QueueHandler(log_queue))
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter("%(message)s"))
+        self._log_listener = logging.handlers.QueueListener(log_queue, stream)
+        self._log_listener.start()
+
+        # Verb -> handler, so dispatch is one dict probe instead of an
+        # if/elif chain of string compares.
+        self._handlers = {
+            "ADD": self.handle_add,
+            "LOOKUP": self.handle_lookup,
+            "LIST": self.handle_list,
+        }
 
     def start(self):
-        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server_socket.bind(('', self.port))
-        server_socket.listen(5)
-        print(f"Server listening on port {self.port}")
-
+        # One selector-based event loop instead of a thread per peer:
+        # idle connections cost a registered fd, not a blocked OS
+        # thread, and all index mutations run on the loop so no lock
+        # is needed.
+        if uvloop is not None:
+            uvloop.install()
         try:
-            while True:
-                client_socket, addr = server_socket.accept()
-                print(f"Connection from {addr}")
-                client_thread = threading.Thread(
-                    target=self.handle_client, args=(client_socket, addr)
-                )
-                client_thread.start()
+            asyncio.run(self._serve())
         except KeyboardInterrupt:
             print("Server shutting down")
         finally:
-            server_socket.close()
+            self._log_listener.stop()
+
+    async def _serve(self):
+        server = await asyncio.start_server(
+            self.handle_client, host='', port=self.port
+        )
+        print(f"Server listening on port {self.port}")
+        async with server:
+            await server.serve_forever()
 
-    def extract_headers(self, raw_request: str):
+    def parse_request(self, raw_request: str):
         """
-        Helper to parse headers from a P2S request.
-        Returns a dict like {"Host": "...", "Port": "...", "Title": "..."}
+        Parse one P2S request in a single pass.
+        Returns (request_line_tokens, headers) where headers is a dict
+        like {"Host": "...", "Port": "...", "Title": "..."}. The parse
+        is shared by logging, peer tracking and dispatch so the raw
+        string is scanned exactly once.
         """
+        lines = raw_request.split(CRLF) if CRLF in raw_request else raw_request.split('\n')
+        request_line = lines[0].split()
         headers = {}
-        normalized = raw_request.replace("\r\n", "\n")
-        lines = normalized.strip().split('\n')
+        # Fast reject: a malformed or wrong-version request is answered
+        # with 400/505 without paying for the header dict.
+        if len(request_line) < 3 or request_line[-1] != PROTOCOL_VERSION:
+            return request_line, headers
         for line in lines[1:]:
+            if not line:
+                break
             if ':' in line:
                 key, value = line.split(':', 1)
                 headers[key.strip()] = value.strip()
-        return headers
+        return request_line, headers
 
-    def handle_client(self, client_socket: socket.socket, addr):
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
         """
         Handle all requests from a single peer connection.
         When the peer disconnects, remove its records from the database.
         """
+        addr = writer.get_extra_info('peername')
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            if self.tcp_nodelay:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # Peers hold their server connection open for their whole
+            # lifetime; keepalive probes reap ones that vanish without
+            # a FIN so their records get cleaned up.
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self._log.info("Connection from %s", addr)
+
         peer_host = None
         peer_port = None
         peer_name = None
@@ -63,12 +148,21 @@ class P2PServer:
 
         try:
             while True:
-                data = client_socket.recv(4096).decode('utf-8')
-                if not data:
+                # One CRLF-CRLF-terminated request at a time; pipelined
+                # requests coalesced into one segment stay buffered in
+                # the reader for the next iteration.
+                last = False
+                try:
+                    frame = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError as e:
+                    # Tolerate a final request without the terminator.
+                    frame = e.partial
+                    last = True
+                if not frame:
                     break
+                request_line, headers = self.parse_request(frame.decode('utf-8'))
 
                 # Track Host and Port for cleanup later
-                headers = self.extract_headers(data)
                 if 'Host' in headers:
                     peer_host = headers['Host']
                 if 'Hostname' in headers:
@@ -85,11 +179,15 @@ class P2PServer:
                     self.register_peer(peer_name, peer_host, peer_port)
                     peer_registered = True
 
-                self.log_request(peer_name, peer_host, peer_port, addr, data)
+                self.log_request(peer_name, peer_host, peer_port, addr, request_line)
 
-                response = self.process_request(data)
+                response = self.process_request(request_line, headers)
                 if response:
-                    client_socket.sendall(response.encode('utf-8'))
+                    writer.write(response)
+                    await writer.drain()
+
+                if last:
+                    break
 
         except Exception as e:
             # You can uncomment this for debugging
@@ -97,41 +195,33 @@ class P2PServer:
             pass
         finally:
             if peer_name is not None and peer_port is not None and peer_host is not None:
-                print(f"Peer {peer_name} ({peer_host}:{peer_port}) disconnected")
+                self._log.info("Peer %s (%s:%s) disconnected", peer_name, peer_host, peer_port)
                 self.remove_peer(peer_name, peer_host, peer_port)
             else:
-                print(f"Peer at {addr} disconnected before registration")
-            client_socket.close()
-
-    def process_request(self, request: str) -> str:
-        normalized = request.replace("\r\n", "\n")
-        lines = normalized.strip().split('\n')
-        if not lines:
-            return self._build_response(400, "Bad Request")
-
-        request_line = lines[0].split()
+                self._log.info("Peer at %s disconnected before registration", addr)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    def process_request(self, request_line, headers) -> bytes:
+        """Dispatch one already-parsed request (see parse_request)."""
         if len(request_line) < 3:
             return self._build_response(400, "Bad Request")
 
-        method = request_line[0]
         rfc_part = request_line[1:3]  # e.g. ["RFC", "123"]
         version = request_line[-1]
 
         if version != PROTOCOL_VERSION:
             return self._build_response(505, "PCP-CI Version Not Supported")
 
-        headers = self.extract_headers(request)
-
-        if method == "ADD":
-            return self.handle_add(rfc_part, headers)
-        elif method == "LOOKUP":
-            return self.handle_lookup(rfc_part, headers)
-        elif method == "LIST":
-            return self.handle_list(headers)
-        else:
+        handler = self._handlers.get(request_line[0])
+        if handler is None:
             return self._build_response(400, "Bad Request")
+        return handler(rfc_part, headers)
 
-    def handle_add(self, rfc_part, headers) -> str:
+    def handle_add(self, rfc_part, headers) -> bytes:
         if len(rfc_part) < 2 or rfc_part[0] != "RFC":
             return self._build_response(400, "Bad Request")
 
@@ -154,21 +244,23 @@ class P2PServer:
         except ValueError:
             return self._build_response(400, "Bad Request")
 
-        with self.lock:
-            # Register peer if not already present
-            if (peer_name, host, port_num) not in self.peers:
-                self.peers.insert(0, (peer_name, host, port_num))
+        # All index mutations run on the event loop, so no lock is
+        # needed around them.
+        peer_key = (peer_name, host, port_num)
+        self.peers.add(peer_key)
 
-            # Register RFC if not already in index for this peer
-            record = (rfc_num, title, peer_name, host, port_num)
-            if record not in self.rfc_index:
-                self.rfc_index.insert(0, record)
+        records = self.rfc_by_num.setdefault(rfc_num, {})
+        record_key = (title, peer_name, host, port_num)
+        wire = records.get(record_key)
+        if wire is None:
+            wire = f"RFC {rfc_num} {title} {peer_name} {host} {port_num}"
+            records[record_key] = wire
+            self.rfcs_by_peer.setdefault(peer_key, set()).add((rfc_num, title))
 
         # Echo back as per spec
-        body = f"RFC {rfc_num} {title} {peer_name} {host} {port_num}"
-        return self._build_response(200, "OK", body)
+        return self._build_response(200, "OK", wire)
 
-    def handle_lookup(self, rfc_part, headers) -> str:
+    def handle_lookup(self, rfc_part, headers) -> bytes:
         if len(rfc_part) < 2 or rfc_part[0] != "RFC":
             return self._build_response(400, "Bad Request")
 
@@ -177,25 +269,20 @@ class P2PServer:
         except ValueError:
             return self._build_response(400, "Bad Request")
 
-        with self.lock:
-            matches = [
-                f"RFC {r} {t} {n} {h} {p}"
-                for (r, t, n, h, p) in self.rfc_index
-                if r == rfc_num
-            ]
+        matches = self.rfc_by_num.get(rfc_num)
 
         if matches:
-            body = CRLF.join(matches)
+            body = CRLF.join(matches.values())
             return self._build_response(200, "OK", body)
         else:
             return self._build_response(404, "Not Found")
 
-    def handle_list(self, headers) -> str:
-        with self.lock:
-            lines = [
-                f"RFC {r} {t} {n} {h} {p}"
-                for (r, t, n, h, p) in self.rfc_index
-            ]
+    def handle_list(self, rfc_part, headers) -> bytes:
+        lines = [
+            wire
+            for records in self.rfc_by_num.values()
+            for wire in records.values()
+        ]
 
         body = CRLF.join(lines) if lines else ""
         return self._build_response(200, "OK", body)
@@ -204,63 +291,68 @@ class P2PServer:
         """
         Ensure a peer entry exists for the active connection.
         """
-        with self.lock:
-            if (peer_name, host, port) not in self.peers:
-                self.peers.insert(0, (peer_name, host, port))
+        self.peers.add((peer_name, host, port))
 
-    def log_request(self, peer_name, host, port, addr, raw_request):
+    def log_request(self, peer_name, host, port, addr, request_line):
         """
         Log which peer sent which request line.
         """
-        first_line = raw_request.splitlines()[0].strip() if raw_request else "<empty>"
+        if not self.verbose:
+            return
+        first_line = " ".join(request_line) if request_line else "<empty>"
         if peer_name and port:
             peer_label = f"{peer_name}:{port}"
         elif host and port:
             peer_label = f"{host}:{port}"
         else:
             peer_label = f"{addr}"
-        print(f"[REQ] {peer_label} -> {first_line}")
+        self._log.info("[REQ] %s -> %s", peer_label, first_line)
 
     def remove_peer(self, peer_name: str, host: str, port: int):
         """
         Remove all records for a given (host, port) when a peer disconnects.
         """
-        with self.lock:
-            self.peers = [
-                (n, h, p) for (n, h, p) in self.peers
-                if not (n == peer_name and h == host and p == port)
-            ]
-
-            self.rfc_index = [
-                (r, t, n, h, p)
-                for (r, t, n, h, p) in self.rfc_index
-                if not (n == peer_name and h == host and p == port)
-            ]
-
-    def _build_response(self, status_code: int, phrase: str, body: str = "") -> str:
-        """Construct RFC-compliant response with standard headers."""
+        peer_key = (peer_name, host, port)
+        self.peers.discard(peer_key)
+
+        for rfc_num, title in self.rfcs_by_peer.pop(peer_key, ()):
+            records = self.rfc_by_num.get(rfc_num)
+            if records is None:
+                continue
+            records.pop((title, peer_name, host, port), None)
+            if not records:
+                del self.rfc_by_num[rfc_num]
+
+    def _build_response(self, status_code: int, phrase: str, body: str = "") -> bytes:
+        """
+        Construct an RFC-compliant response with standard headers,
+        encoded once here so callers can write it straight to the
+        socket.
+        """
         if body is None:
             body = ""
         body_str = body
-        timestamp = datetime.now(timezone.utc).strftime('%a, %d %b %Y %H:%M:%S GMT')
-        os_info = f"{platform.system()} {platform.release()}"
+        timestamp = _http_date_now()
+        os_info = self._os_info
         body_length = len(body_str.encode('utf-8'))
 
+        # No Last-Modified here: the directory server generates every
+        # response, so it would just duplicate Date. (Peers do send a
+        # real Last-Modified for uploaded RFC files.)
         header_lines = [
             f"{PROTOCOL_VERSION} {status_code} {phrase}",
             f"Date: {timestamp}",
             f"OS: {os_info}",
-            f"Last-Modified: {timestamp}",
             f"Content-Length: {body_length}",
             "Content-Type: text/plain",
         ]
 
-        if body_str:
-            response_lines = header_lines + ["", body_str]
-        else:
-            response_lines = header_lines + [""]
+        # Always close the header block with a blank line, even with no
+        # body: peers frame responses on the CRLF-CRLF terminator and
+        # would block forever on a 404/505 that never sends it.
+        response_lines = header_lines + ["", body_str]
 
-        return CRLF.join(response_lines)
+        return CRLF.join(response_lines).encode('utf-8')
 
 
 if __name__ == "__main__":
@@ -10,36 +10,45 @@ RFCS = [
     (3457, "Requirements for IPsec Remote Access Scenarios"),
 ]
 
+# Dedented once at import; write_single_rfc only fills in the fields.
+RFC_TEMPLATE = dedent(
+    """\
+    RFC {num} - {title}
 
-def ensure_dir(path: str):
-    os.makedirs(path, exist_ok=True)
-    return path
+    This is a sample RFC document for testing the P2P-CI system.
 
+    Abstract:
+    This document describes {title_lower}.
 
-def write_single_rfc(target_dir: str, rfc_num: int, title: str):
-    ensure_dir(target_dir)
-    content = dedent(
-        f"""\
-        RFC {rfc_num} - {title}
+    1. Introduction
+    This RFC provides specifications for {title_lower}.
+
+    2. Implementation
+    The implementation details are provided here.
 
-        This is a sample RFC document for testing the P2P-CI system.
+    3. Conclusion
+    This concludes the RFC document.
+    """
+)
 
-        Abstract:
-        This document describes {title.lower()}.
 
-        1. Introduction
-        This RFC provides specifications for {title.lower()}.
+def ensure_dir(path: str):
+    os.makedirs(path, exist_ok=True)
+    return path
 
-        2. Implementation
-        The implementation details are provided here.
 
-        3. Conclusion
-        This concludes the RFC document.
-        """
-    )
+def write_single_rfc(target_dir: str, rfc_num: int, title: str):
+    ensure_dir(target_dir)
+    data = RFC_TEMPLATE.format(
+        num=rfc_num, title=title, title_lower=title.lower()
+    ).encode('utf-8')
     filepath = os.path.join(target_dir, f"rfc{rfc_num}.txt")
-    with open(filepath, "w") as file_obj:
-        file_obj.write(content)
+    # One unbuffered write through a raw fd; no text-wrapper layer.
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
 
     print(f"Created rfc{rfc_num}.txt in '{target_dir}'")
 